@@ -1,5 +1,77 @@
+from array import array
+from collections import deque
+from operator import itemgetter
+
 from tools import Reader, string_line
 
+# BIT[v] : bit associé à la valeur v (BIT[0] = 0), BIT_TO_VAL : opération inverse
+BIT = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256)
+BIT_TO_VAL = {1 << i: i + 1 for i in range(9)}
+
+def values_mask(values: list) -> int:
+    """
+    Convertit une liste de valeurs en masque de bits.
+
+    Args:
+        values: Liste des valeurs (1 à 9).
+
+    Returns:
+        int: Masque où le bit v-1 est levé pour chaque valeur v.
+    """
+    mask = 0
+    for v in values:
+        mask |= BIT[v]
+    return mask
+
+def mask_values(mask: int) -> list:
+    """
+    Convertit un masque de bits en liste de valeurs triées.
+
+    Args:
+        mask: Masque de 9 bits.
+
+    Returns:
+        list: Valeurs v dont le bit v-1 est levé.
+    """
+    return [v for v in range(1, 10) if mask & BIT[v]]
+
+# Tables d'indices calculées une seule fois : cases de chaque ligne, colonne,
+# carré, les 20 voisines (pairs) de chaque case et les numéros des 3 unités
+# contenant chaque case (0..8 lignes, 9..17 colonnes, 18..26 carrés).
+ROWS = tuple(tuple(i * 9 + j for j in range(9)) for i in range(9))
+COLS = tuple(tuple(j * 9 + i for j in range(9)) for i in range(9))
+BOXES = tuple(tuple((b // 3 * 3 + k // 3) * 9 + b % 3 * 3 + k % 3 for k in range(9))
+              for b in range(9))
+PEERS = tuple(tuple(sorted({*ROWS[i // 9], *COLS[i % 9], *BOXES[i // 27 * 3 + i % 9 // 3]} - {i}))
+              for i in range(81))
+def _unit_segments() -> tuple:
+    """
+    Calcule, pour chaque unité, les intersections carré/ligne qu'elle contient.
+
+    Returns:
+        tuple: Pour chaque unité (0..8 lignes, 9..17 colonnes, 18..26 carrés), les triplets
+        (intersection, reste de la ligne, reste du carré) d'indices.
+    """
+    segments = [[] for _ in range(27)]
+    for b, box in enumerate(BOXES):
+        crossing = [b // 3 * 3 + r for r in range(3)] + [9 + b % 3 * 3 + c for c in range(3)]
+        for u in crossing:
+            line = ROWS[u] if u < 9 else COLS[u - 9]
+            segment = (tuple(k for k in line if k in box),
+                       tuple(k for k in line if k not in box),
+                       tuple(k for k in box if k not in line))
+            segments[u].append(segment)
+            segments[18 + b].append(segment)
+    return tuple(tuple(s) for s in segments)
+
+UNIT_SEGMENTS = _unit_segments()
+# Extracteurs des 27 unités d'une grille (lignes, colonnes puis carrés)
+UNIT_GETTERS = tuple(itemgetter(*indices) for indices in ROWS + COLS + BOXES)
+CELL_UNITS = tuple((i // 9, 9 + i % 9, 18 + i // 27 * 3 + i % 9 // 3) for i in range(81))
+
+# Ligne séparant les blocs de carrés dans l'affichage de la grille
+SEPARATOR = "- " * 11 + "\n"
+
 class Cell:
     """
     Représente une case d'un Sudoku.
@@ -7,9 +79,14 @@ class Cell:
     Attributes:
         idnum: Numéro de la case.
         value: Valeur de la case.
-        domain: Domaine de la case.
+        domain: Domaine de la case, masque de 9 bits (bit v-1 = valeur v possible).
         locked: Indique si la case est bloquée.
+        row: Ligne de la case.
+        col: Colonne de la case.
+        box: Carré de la case.
     """
+    __slots__ = ('idnum', 'value', 'domain', 'locked', 'row', 'col', 'box')
+
     def __init__(self, idnum: int):
         """
         Initialise la case.
@@ -19,8 +96,11 @@ class Cell:
         """
         self.idnum = idnum
         self.value = 0
-        self.domain = {1, 2, 3, 4, 5, 6, 7, 8, 9}
+        self.domain = 0x1FF
         self.locked = False
+        self.row = idnum // 9
+        self.col = idnum % 9
+        self.box = (self.row // 3) * 3 + (self.col // 3)
 
     def __str__(self):
         """
@@ -40,7 +120,7 @@ class Cell:
         Returns:
             int: Ligne de la case.
         """
-        return self.idnum // 9
+        return self.row
 
     def column(self) -> int:
         """
@@ -49,7 +129,7 @@ class Cell:
         Returns:
             int: Colonne de la case.
         """
-        return self.idnum % 9
+        return self.col
 
     def square(self) -> int:
         """
@@ -58,10 +138,7 @@ class Cell:
         Returns:
             int : Carré de la case.
         """
-        row, col = self.line(), self.column()
-        square_row = row // 3
-        square_col = col // 3
-        return square_row * 3 + square_col
+        return self.box
 
 
     def remove_value(self, value: int) -> bool:
@@ -74,8 +151,9 @@ class Cell:
         Returns:
             bool: True si le domaine a été modifié, False sinon.
         """
-        if value in self.domain:
-            self.domain.remove(value)
+        bit = BIT[value]
+        if self.domain & bit:
+            self.domain &= ~bit
             return True
         return False
 
@@ -86,8 +164,10 @@ class Cell:
         Returns:
             bool: True si la valeur a été mise à jour, False sinon.
         """
-        if len(self.domain) == 1:
-            self.value = self.domain.pop()
+        d = self.domain
+        if d and d & (d - 1) == 0:
+            self.value = BIT_TO_VAL[d]
+            self.domain = 0
             self.locked = True
             return True
         return False
@@ -103,10 +183,9 @@ class Cell:
             bool: True si le domaine a été modifié, False sinon.
         """
 
-        ancien = len(self.domain)
-        self.domain = self.domain.intersection(values)
-        nouveau = len(self.domain)
-        return ancien != nouveau
+        ancien = self.domain
+        self.domain &= values_mask(values)
+        return ancien != self.domain
 
     def reduce_domain(self, values: list) -> bool:
         """
@@ -118,10 +197,9 @@ class Cell:
         Returns:
             bool: True si le domaine a été modifié, False sinon.
         """
-        ancien = len(self.domain)
-        self.domain -= set(values)
-        nouveau = len(self.domain)
-        return ancien != nouveau
+        ancien = self.domain
+        self.domain &= ~values_mask(values)
+        return ancien != self.domain
 
 class Sudoku:
     """
@@ -129,14 +207,29 @@ class Sudoku:
 
     Attributes:
         internal_grid: Liste de cases.
+        row_units: Cases de chaque ligne.
+        col_units: Cases de chaque colonne.
+        box_units: Cases de chaque carré.
+        units: Les 27 unités (lignes, colonnes puis carrés).
+        row_placed: Masques des valeurs déjà placées dans chaque ligne.
+        col_placed: Masques des valeurs déjà placées dans chaque colonne.
+        box_placed: Masques des valeurs déjà placées dans chaque carré.
+        dirty: Numéros des unités à réexaminer (0..8 lignes, 9..17 colonnes, 18..26 carrés).
     """
 
     def __init__(self):
         """
         Initialise la grille.
         """
-        self.reset()
-    
+        self.internal_grid = [Cell(i) for i in range(81)]
+        grid = self.internal_grid
+        # Les cases ne sont jamais remplacées (reset les réinitialise sur place) : les unités sont figées
+        self.units = tuple([get(grid) for get in UNIT_GETTERS])
+        self.row_units = self.units[:9]
+        self.col_units = self.units[9:18]
+        self.box_units = self.units[18:]
+        self._reset_masks()
+
     def reset(self):
         """
         Réinitialise la grille.
@@ -147,8 +240,26 @@ class Sudoku:
         Returns:
             None
         """
+        for cell in self.internal_grid:
+            cell.value = 0
+            cell.domain = 0x1FF
+            cell.locked = False
+        self._reset_masks()
+
+    def _reset_masks(self):
+        """
+        Réinitialise les masques des valeurs placées et la file des unités à réexaminer.
 
-        self.internal_grid = [Cell(i) for i in range(81)]
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.row_placed = [0] * 9
+        self.col_placed = [0] * 9
+        self.box_placed = [0] * 9
+        self.dirty = set(range(27))
 
     def __str__(self) -> str:
         """
@@ -157,21 +268,20 @@ class Sudoku:
         Returns:
             str: Représentation de la grille de Sudoku.
         """
-        result = ""
+        parts = []
+        append = parts.append
         for i in range(9):
             for j in range(9):
                 cell = self.internal_grid[i * 9 + j]
-                if cell.locked:
-                    result += f"{cell.value} "
-                else:
-                    result += ". "
+                append(str(cell.value) if cell.locked else ".")
+                append(" ")
                 if (j + 1) % 3 == 0 and j < 8:
-                    result += "| "
-            result = result[:-1]  
-            result += "\n"
+                    append("| ")
+            # Remplace l'espace final de la ligne par un retour à la ligne
+            parts[-1] = "\n"
             if (i + 1) % 3 == 0 and i < 8:
-                result += "- " * 11 + "\n"
-        return result
+                append(SEPARATOR)
+        return "".join(parts)
 
     def line(self, i: int) -> list:
         """
@@ -181,13 +291,9 @@ class Sudoku:
             i: Numéro de la ligne.
 
         Returns:
-            line_cells: Ligne i de la grille.
+            list: Ligne i de la grille.
         """
-        line_cells = []
-        for cell in self.internal_grid:
-            if i == cell.line():
-                line_cells.append(cell)
-        return line_cells
+        return list(self.row_units[i])
 
     def column(self, i: int) -> list:
         """
@@ -197,13 +303,9 @@ class Sudoku:
             i: Numéro de la colonne.
 
         Returns:
-            column_cells: Colonne i de la grille.
+            list: Colonne i de la grille.
         """
-        column_cells = []
-        for cell in self.internal_grid:
-            if i == cell.column():
-                column_cells.append(cell)
-        return column_cells
+        return list(self.col_units[i])
 
     def square(self, i: int) -> list:
         """
@@ -213,13 +315,34 @@ class Sudoku:
             i: Numéro du carré.
 
         Returns:
-            square_cells: Carré i de la grille.
+            list: Carré i de la grille.
         """
-        square_cells = []
-        for cell in self.internal_grid:
-            if cell.square() == i:
-                square_cells.append(cell)
-        return square_cells
+        return list(self.box_units[i])
+
+    def _placed(self, u: int) -> int:
+        """
+        Retourne le masque des valeurs déjà placées dans l'unité u.
+
+        Args:
+            u: Numéro de l'unité (0..8 lignes, 9..17 colonnes, 18..26 carrés).
+
+        Returns:
+            int: Masque des valeurs placées dans l'unité.
+        """
+        if u < 9:
+            return self.row_placed[u]
+        if u < 18:
+            return self.col_placed[u - 9]
+        return self.box_placed[u - 18]
+
+    def _mark_dirty(self, cell: Cell):
+        """
+        Marque comme à réexaminer les trois unités contenant la case.
+
+        Args:
+            cell: Instance de la classe Cell.
+        """
+        self.dirty.update(CELL_UNITS[cell.idnum])
 
     def neighbors(self, cell: Cell) -> list:
         """
@@ -229,15 +352,9 @@ class Sudoku:
             cell: Instance de la classe Cell.
 
         Returns:
-            neighbors: Liste des cases voisines.
+            list: Liste des cases voisines.
         """
-        line_cells = self.line(cell.line())
-        column_cells = self.column(cell.column())
-        square_cells = self.square(cell.square())
-
-        neighbors = set(line_cells + square_cells + column_cells)
-
-        return list(neighbors)
+        return [self.internal_grid[k] for k in PEERS[cell.idnum]]
 
     def propagate(self, cell: Cell) -> list:
         """
@@ -248,39 +365,50 @@ class Sudoku:
             cell: Instance de la classe Cell.
 
         Returns:
-            list: Ensemble des cases ayant une seule valeure dans leurs domaines.
-        """
-        neighbors_cells = self.neighbors(cell)
-        cells = set()
-        
-        for neighbor in neighbors_cells:
+            list: Liste des cases ayant une seule valeure dans leurs domaines.
+        """
+        grid = self.internal_grid
+        cells = []
+        bit = BIT[cell.value]
+        # propagate est appelée à chaque placement : on met à jour les masques des unités
+        self.row_placed[cell.row] |= bit
+        self.col_placed[cell.col] |= bit
+        self.box_placed[cell.box] |= bit
+
+        for k in PEERS[cell.idnum]:
+            neighbor = grid[k]
             if not neighbor.locked:
-                if cell.value in neighbor.domain:
-                    neighbor.domain.remove(cell.value)
-                    if len(neighbor.domain) == 1:
-                        cells.add(neighbor)
+                if neighbor.domain & bit:
+                    neighbor.domain ^= bit
+                    self._mark_dirty(neighbor)
+                    if neighbor.domain.bit_count() == 1:
+                        cells.append(neighbor)
 
         return cells
 
     def set_values(self, cells: list) -> bool:
             """
-            Applique la méthode update_value sur chaque case de l'ensemble donné et ajoute
-            les cases retournées par propagate dans l'ensemble. Renvoie True s'il y a eu au moins
+            Applique la méthode update_value sur chaque case de la file donnée et ajoute
+            les cases retournées par propagate à la file. Renvoie True s'il y a eu au moins
             une mise à jour par update_value, False sinon.
 
             Args:
-                cells: Ensemble de cases à traiter.
+                cells: Liste de cases à traiter.
 
             Returns:
                 bool: True s'il y a eu au moins une mise à jour, False sinon.
             """
             updated = False
+            queue = deque(cells)
 
-            while cells:
-                current_cell = cells.pop()
+            while queue:
+                current_cell = queue.popleft()
+                # Une case peut être enfilée plusieurs fois : on ignore celles déjà fixées
+                if current_cell.locked:
+                    continue
                 if current_cell.update_value():
                     updated = True
-                    cells |= self.propagate(current_cell)
+                    queue.extend(self.propagate(current_cell))
 
             return updated
     def grid_parser(self, input_list: list):
@@ -290,28 +418,47 @@ class Sudoku:
         Args:
             input_list: Liste d'entrée pouvant être une liste de 81 entiers ou une liste de 9 listes de 9 entiers.
         """
-        self.reset()
-        todo = set()
-        #verifier que input_list est constituer d'entier puis partitionne ce dernier en 9 listes
-        if all(isinstance(item, int) for item in input_list):
-            input_list = [input_list[i:i+9] for i in range(0, 81, 9)]
-        #on itere sur chaque ligne et sur chaque element de cette ligne (ligne = sub_list)
-        for i, sub_list in enumerate(input_list):
-            for j, value in enumerate(sub_list):
-                cell = self.internal_grid[i * 9 + j]
+        #un seul test suffit : soit 9 listes de 9 entiers, soit des entiers (liste vide = grille vide)
+        if input_list and not isinstance(input_list[0], int):
+            self.parse_nested(input_list)
+        else:
+            self.parse_flat(input_list)
 
-                if 0 < value <= 9:
-                    if not cell.locked:
-                        if value in cell.domain:
-                            cell.value = value
-                            cell.locked = True
-                            cell.domain = {value}
+    def parse_flat(self, flat: list):
+        """
+        Initialise la grille de Sudoku à partir d'une liste de 81 entiers (0 pour une case vide).
+
+        Args:
+            flat: Liste de 81 entiers.
+        """
+        self.reset()
+        grid = self.internal_grid
+        todo = []
+        for i, value in enumerate(flat):
+            if 0 < value <= 9:
+                cell = grid[i]
+                bit = BIT[value]
+                # Une valeur déjà exclue par les cases précédentes est ignorée
+                if cell.domain & bit:
+                    cell.value = value
+                    cell.locked = True
+                    cell.domain = bit
+                    todo.extend(self.propagate(cell))
+        self.set_values(todo)
+
+    def parse_nested(self, nested: list):
+        """
+        Initialise la grille de Sudoku à partir d'une liste de 9 listes de 9 entiers.
 
-                            todo |= set(self.propagate(cell))
+        Args:
+            nested: Liste de 9 lignes de 9 entiers.
+        """
+        self.parse_flat([value for sub_list in nested for value in sub_list])
 
     def find_unique(self, related_cells: list) -> bool:
         """
-        Trouve les cases qui sont solution unique d'une affectation possible parmi les cases liées.
+        Trouve les cases qui sont solution unique d'une affectation possible parmi les cases liées,
+        ainsi que les cases dont le domaine ne contient plus qu'une valeur.
 
         Args:
             related_cells: Liste des cases liées.
@@ -319,30 +466,39 @@ class Sudoku:
         Returns:
             bool: True s'il existe au moins une case modifiée, False sinon.
         """
-        dico_val = {v: [] for v in range(1, 10)}
-        todo = set()
-        rep = False  
-        
+        todo = []
+        rep = False
 
+        # once : valeurs vues au moins une fois, multi : valeurs vues au moins deux fois
+        once = 0
+        multi = 0
+
+        # Phase 1 : Un seul passage sur l'unité pour les deux accumulateurs et les singletons
         for case in related_cells:
             # Si la case est bloquée, on passe à la suivante
             if case.locked:
                 continue
 
-            for v in case.domain:
-                dico_val[v].append(case)
-        # Phase 2 : Regarder si on a une valeur v qui correspond à une case unique
-        for k, l in dico_val.items():
-            if len(l) == 1:
-                rep = True
-                unique_case = l[0]
-                
-                unique_case.value = k
-                unique_case.locked = True
-                unique_case.domain = {k}
-                todo.add(unique_case)
-                
-                todo |= set(self.propagate(unique_case))
+            d = case.domain
+            multi |= once & d
+            once |= d
+            if d and d & (d - 1) == 0:
+                todo.append(case)
+        # Phase 2 : Chaque valeur vue une seule fois correspond à une case unique
+        hidden = once & ~multi
+        while hidden:
+            bit = hidden & -hidden
+            hidden ^= bit
+            # La case a pu être fixée à une autre valeur plus haut dans cette boucle
+            for unique_case in related_cells:
+                if unique_case.domain & bit and not unique_case.locked:
+                    rep = True
+                    unique_case.value = BIT_TO_VAL[bit]
+                    unique_case.locked = True
+                    unique_case.domain = bit
+                    self._mark_dirty(unique_case)
+                    todo.extend(self.propagate(unique_case))
+                    break
 
         return self.set_values(todo) or rep
         
@@ -359,8 +515,8 @@ class Sudoku:
         dico_paires = {}
 
         for case in related_cells:
-            if len(case.domain) == 2:
-                key = tuple(sorted(case.domain))
+            if case.domain.bit_count() == 2:
+                key = case.domain
                 if key in dico_paires:
                     dico_paires[key].append(case)
                 else:
@@ -370,49 +526,219 @@ class Sudoku:
 
         for key, pair_list in dico_paires.items():
             if len(pair_list) == 2:
-                # Modifier les autres cases ayant le même domaine
+                inv = ~key & 0x1FF
+                # Retirer les valeurs de la paire du domaine des autres cases
                 for case in related_cells:
-                    if case not in pair_list:
-                        # Retirer les valeurs de la paire du domaine des autres cases
-                        if case.reduce_domain(list(key)):
+                    if case.domain != key and not case.locked:
+                        new = case.domain & inv
+                        if new != case.domain:
+                            case.domain = new
                             success = True
+                            self._mark_dirty(case)
+
+        return self.set_values(related_cells) or success
+
+    def find_locked_candidates(self, i: int) -> bool:
+        """
+        Cherche les candidats verrouillés du carré i : si toutes les occurrences d'une valeur
+        dans le carré sont sur une même ligne (ou colonne), on la retire du reste de cette
+        ligne (pointage), et inversement si toutes ses occurrences sur une ligne (ou colonne)
+        sont dans le carré, on la retire du reste du carré (réclamation).
+
+        Args:
+            i: Numéro du carré.
+
+        Returns:
+            bool: True s'il existe au moins une case modifiée, False sinon.
+        """
+        return self._locked_segments(UNIT_SEGMENTS[18 + i])
+
+    def _locked_segments(self, segments: tuple) -> bool:
+        """
+        Applique le pointage et la réclamation sur chaque intersection carré/ligne donnée.
+
+        Args:
+            segments: Triplets (intersection, reste de la ligne, reste du carré) d'indices.
+
+        Returns:
+            bool: True s'il existe au moins une case modifiée, False sinon.
+        """
+        success = False
+        todo = []
+        for inter, line_rest, box_rest in segments:
+            segment = self._candidates(inter)
+            if not segment:
+                continue
+            pointing = segment & ~self._candidates(box_rest)
+            claiming = segment & ~self._candidates(line_rest)
+            if pointing and self._eliminate(line_rest, pointing, todo):
+                success = True
+            if claiming and self._eliminate(box_rest, claiming, todo):
+                success = True
+
+        return self.set_values(todo) or success
+
+    def _candidates(self, indices: tuple) -> int:
+        """
+        Retourne l'union des domaines des cases libres données.
+
+        Args:
+            indices: Indices des cases.
+
+        Returns:
+            int: Masque des valeurs encore possibles dans ces cases.
+        """
+        grid = self.internal_grid
+        mask = 0
+        for k in indices:
+            cell = grid[k]
+            if not cell.locked:
+                mask |= cell.domain
+        return mask
+
+    def _eliminate(self, indices: tuple, bits: int, todo: list) -> bool:
+        """
+        Retire les valeurs du masque des domaines des cases libres données et ajoute à todo
+        celles qui n'ont plus qu'une valeur possible.
+
+        Args:
+            indices: Indices des cases.
+            bits: Masque des valeurs à retirer.
+            todo: Liste des cases devenues des singletons (complétée sur place).
+
+        Returns:
+            bool: True si au moins un domaine a été modifié, False sinon.
+        """
+        grid = self.internal_grid
+        changed = False
+        for k in indices:
+            cell = grid[k]
+            if not cell.locked and cell.domain & bits:
+                cell.domain &= ~bits
+                self._mark_dirty(cell)
+                changed = True
+                if cell.domain.bit_count() == 1:
+                    todo.append(cell)
+        return changed
+
+    def deduce(self, lvl: int = 1):
+        """
+        Applique find_unique (et find_pairs si lvl == 2) sur les unités marquées comme
+        modifiées (self.dirty) jusqu'à ce qu'il n'y en ait plus.
+
+        Args:
+            lvl (int): Niveau de résolution (1 ou 2) par defaut = 1.
+        """
+        while self.dirty:
+            u = self.dirty.pop()
+            # Les unités dont les 9 valeurs sont placées n'ont plus rien à déduire
+            if self._placed(u) == 0x1FF:
+                continue
+            related_cells = self.units[u]
+            self.find_unique(related_cells)
+            if lvl == 2:
+                self.find_pairs(related_cells)
+                # Un carré vérifie ses 6 intersections, une ligne ou colonne ses 3
+                self._locked_segments(UNIT_SEGMENTS[u])
+
+    def is_consistent(self) -> bool:
+        """
+        Vérifie qu'aucune case libre n'a un domaine vide et que chaque unité peut encore
+        recevoir ses 9 valeurs.
+
+        Returns:
+            bool: True si la grille peut encore être complétée, False sinon.
+        """
+        for u, unit in enumerate(self.units):
+            seen = self._placed(u)
+            for cell in unit:
+                if not cell.locked:
+                    if not cell.domain:
+                        return False
+                    seen |= cell.domain
+            if seen != 0x1FF:
+                return False
+        return True
+
+    def _snapshot(self) -> array:
+        """
+        Sauvegarde l'état de la grille dans un seul tableau de 189 entiers sur 16 bits :
+        les 81 domaines, les 81 valeurs puis les 27 masques d'unités. Une case est
+        bloquée si et seulement si sa valeur est non nulle.
+
+        Returns:
+            array: État de la grille.
+        """
+        grid = self.internal_grid
+        snap = array('H', [c.domain for c in grid])
+        snap.extend([c.value for c in grid])
+        snap.extend(self.row_placed + self.col_placed + self.box_placed)
+        return snap
+
+    def _restore(self, snap: array):
+        """
+        Restaure un état sauvegardé par _snapshot.
+
+        Args:
+            snap: État de la grille renvoyé par _snapshot.
+        """
+        for i, cell in enumerate(self.internal_grid):
+            v = snap[81 + i]
+            cell.domain = snap[i]
+            cell.value = v
+            cell.locked = v != 0
+        self.row_placed[:] = snap[162:171]
+        self.col_placed[:] = snap[171:180]
+        self.box_placed[:] = snap[180:189]
+        self.dirty = set()
+
+    def _search(self, lvl: int = 1) -> bool:
+        """
+        Recherche par retour arrière : choisit la case libre ayant le plus petit domaine (MRV),
+        essaie d'abord les valeurs qui contraignent le moins ses voisines (LCV) et relance
+        la propagation après chaque essai.
+
+        Args:
+            lvl (int): Niveau de résolution utilisé pour la propagation.
+
+        Returns:
+            bool: True si la grille a été complétée, False sinon (l'état est alors restauré).
+        """
+        if not self.is_consistent():
+            return False
+        grid = self.internal_grid
+        idx = min((i for i in range(81) if not grid[i].locked),
+                  key=lambda i: grid[i].domain.bit_count(), default=None)
+        if idx is None:
+            return True
+
+        peers = [grid[k] for k in PEERS[idx] if not grid[k].locked]
+        bits = sorted((BIT[v] for v in mask_values(grid[idx].domain)),
+                      key=lambda b: sum(1 for n in peers if n.domain & b))
+        snap = self._snapshot()
+        for b in bits:
+            cell = grid[idx]
+            cell.value = BIT_TO_VAL[b]
+            cell.locked = True
+            cell.domain = b
+            # Les valeurs abandonnées par la case changent ses unités : on les réexamine
+            self._mark_dirty(cell)
+            self.set_values(self.propagate(cell))
+            self.deduce(lvl)
+            if self._search(lvl):
+                return True
+            self._restore(snap)
+        return False
 
-        return self.set_values(set(related_cells)) or success
-    
     def solve(self, lvl: int = 1):
         """
-        Résout le Sudoku en utilisant les méthodes find_unique et find_pairs en fonction du niveau (lvl).
+        Résout le Sudoku en utilisant les méthodes find_unique et find_pairs en fonction du niveau (lvl),
+        puis termine par une recherche avec retour arrière si la propagation ne suffit pas.
 
         Args:
             lvl (int): Niveau de résolution (1 ou 2) par defaut = 1.
         """
-        cpt = 0
-        while cpt < 81:
-            # Liste des résultats de find_unique et find_pairs pour chaque itération
-            results = []
-
-            if lvl == 1:
-                # Tant qu'il y a au moins une modification et que cpt < 81
-                for i in range(9):
-                    results.append(self.find_unique(self.line(i)))
-                for i in range(9):
-                    results.append(self.find_unique(self.column(i)))
-                for i in range(9):
-                    results.append(self.find_unique(self.square(i)))
-
-            elif lvl == 2:
-                # Tant qu'il y a au moins une modification et que cpt < 81
-                for i in range(9):
-                    results.append(self.find_unique(self.line(i)))
-                    results.append(self.find_pairs(self.line(i)))
-                for i in range(9):
-                    results.append(self.find_unique(self.column(i)))
-                    results.append(self.find_pairs(self.column(i)))
-                for i in range(9):
-                    results.append(self.find_unique(self.square(i)))
-                    results.append(self.find_pairs(self.square(i)))
-
-            if any(results):
-                cpt += 1
-            else:
-                break
+        # Unités 0..8 : lignes, 9..17 : colonnes, 18..26 : carrés
+        self.dirty = set(range(27))
+        self.deduce(lvl)
+        self._search(lvl)
@@ -1,20 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+# '0'..'9' -> 0..9 et '.' -> 0
+CHARS = b'.0123456789'
+DIGITS = bytes.maketrans(CHARS, b'\x00' + bytes(range(10)))
+
+def digits(data:bytes) -> list:
+    ''' '0'..'9' and '.' to ints, raises ValueError on any other byte '''
+    bad = data.translate(None, CHARS)
+    if bad:
+        raise ValueError(f"invalid sudoku character(s): {bad[:10]!r}")
+    return list(data.translate(DIGITS))
 
 def string_line(line:str) -> list:
     ''' requires |line| = 81 '''
-    _in = line.replace('.','0')
-    return [int(x) for x in _in]
+    return digits(line.encode())
 
 class Reader:
      ''' sudoku blocks' reader '''
      def __init__(self, fname:str):
          print(f'loading {fname} ...')
-         with open(fname, 'r') as f:
-             lines = f.readlines()
-         self.lines = []
-         for l in lines: self.lines.extend([int(x) for x in l.strip()])
+         with open(fname, 'rb') as f:
+             data = f.read()
+         self.lines = digits(data.translate(None, b' \t\r\n'))
          zeros = self.lines.count(0)
          if __debug__: print(f"missing {zeros}/81 {100*zeros/81:.2f}%")
 